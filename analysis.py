@@ -1,22 +1,57 @@
 # analysis.py
+import os
 import nltk
-from nltk.probability import FreqDist
+import numpy as np
 from collections import Counter
+from itertools import chain
 import re # Make sure re is imported
 from datetime import datetime, timedelta, timezone
 from dateutil import parser as dateparser
-from nltk.collocations import BigramAssocMeasures, BigramCollocationFinder # <-- Import for bigrams
+
+# NLTK data lives next to the app (override with NLTK_DATA)
+NLTK_DATA_DIR = os.getenv("NLTK_DATA", os.path.join(os.path.dirname(__file__), 'nltk_data'))
+
+def _ensure_nltk_data():
+    """Downloads the NLTK data we need if it isn't on disk yet (runs once, at import)."""
+    if NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.append(NLTK_DATA_DIR)
+    # Tokenizing is regex-based, so punkt isn't needed
+    try: nltk.data.find('corpora/stopwords') # Already on disk: skip the index fetch
+    except LookupError: nltk.download('stopwords', quiet=True, download_dir=NLTK_DATA_DIR) # <-- Need stopwords for filtering phrases
 
 # Ensure necessary NLTK data is available
-nltk.download('punkt', quiet=True)
-nltk.download('stopwords', quiet=True) # <-- Need stopwords for filtering phrases
+_ensure_nltk_data()
+
+# Word tokenizer for keyword extraction (applied to lowercased text).
+# Words are runs of Unicode letters ("café", "zürich", "nestlé" stay whole); tokens touching a digit or
+# underscore ("model3", "covid19", "3d") don't match at all, as word_tokenize + isalpha() used to drop them.
+# Possessives are split off like NLTK's word_tokenize did ("tesla's" -> "tesla", "brands'" -> "brands");
+# other apostrophe words ("don't") stay whole and are dropped by the isalpha() filter.
+_WORD_RE = re.compile(r"(?<!\w)([^\W\d_](?:[^\W\d_]|')*?)(?:'s)?'*(?![\w'])")
 
 # Use NLTK's English stopwords list and add our custom ones
-stop_words = set(nltk.corpus.stopwords.words('english'))
-stop_words.update(['com', 'www', 'http', 'https', 'co', 'uk', 'amp', 'rt', 'via']) # Add common web/social junk
+# Frozen: built once at import and only ever read on the keyword hot loop
+stop_words = frozenset(nltk.corpus.stopwords.words('english')) | {'com', 'www', 'http', 'https', 'co', 'uk', 'amp', 'rt', 'via'} # Add common web/social junk
 
 
 # --- ADD THIS FUNCTION BACK ---
+# Define keywords and basic synonyms
+positive_kws = ['good', 'great', 'excellent', 'positive', 'love', 'awesome', 'best', 'happy', 'like', 'amazing', 'superb', 'fantastic', 'recommend', 'perfect']
+negative_kws = ['bad', 'poor', 'terrible', 'negative', 'hate', 'awful', 'worst', 'sad', 'dislike', 'broken', 'fail', 'issue', 'problem', 'disappointed', 'avoid']
+anger_kws = ['angry', 'furious', 'rage', 'mad', 'outrage', 'pissed', 'fuming', 'livid']
+appreciation_kws = ['thank', 'appreciate', 'grateful', 'thanks', 'kudos', 'cheers', 'props', 'helpful']
+mixed_kws = ['but', 'however', 'although', 'yet', 'still', 'despite'] # Conjunctions
+
+def _whole_word_re(words):
+    """One compiled whole-word alternation per tone, so a text is scanned once per tone."""
+    return re.compile(r'\b(?:' + '|'.join(map(re.escape, words)) + r')\b')
+
+_POSITIVE_RE = _whole_word_re(positive_kws)
+_NEGATIVE_RE = _whole_word_re(negative_kws)
+_ANGER_RE = _whole_word_re(anger_kws)
+_APPRECIATION_RE = _whole_word_re(appreciation_kws)
+_MIXED_RE = _whole_word_re(mixed_kws)
+
 def analyze_sentiment_keywords(text):
     """
     Analyzes sentiment based on keywords and simple synonyms.
@@ -26,19 +61,12 @@ def analyze_sentiment_keywords(text):
         return 'neutral'
     text_lower = text.lower()
 
-    # Define keywords and basic synonyms
-    positive_kws = ['good', 'great', 'excellent', 'positive', 'love', 'awesome', 'best', 'happy', 'like', 'amazing', 'superb', 'fantastic', 'recommend', 'perfect']
-    negative_kws = ['bad', 'poor', 'terrible', 'negative', 'hate', 'awful', 'worst', 'sad', 'dislike', 'broken', 'fail', 'issue', 'problem', 'disappointed', 'avoid']
-    anger_kws = ['angry', 'furious', 'rage', 'mad', 'outrage', 'pissed', 'fuming', 'livid']
-    appreciation_kws = ['thank', 'appreciate', 'grateful', 'thanks', 'kudos', 'cheers', 'props', 'helpful']
-    mixed_kws = ['but', 'however', 'although', 'yet', 'still', 'despite'] # Conjunctions
-
-    # Count keyword occurrences using regex for whole words
-    pos_count = sum(1 for k in positive_kws if re.search(r'\b' + re.escape(k) + r'\b', text_lower))
-    neg_count = sum(1 for k in negative_kws if re.search(r'\b' + re.escape(k) + r'\b', text_lower))
-    anger_count = sum(1 for k in anger_kws if re.search(r'\b' + re.escape(k) + r'\b', text_lower))
-    app_count = sum(1 for k in appreciation_kws if re.search(r'\b' + re.escape(k) + r'\b', text_lower))
-    has_mixed = any(re.search(r'\b' + re.escape(k) + r'\b', text_lower) for k in mixed_kws)
+    # Only presence matters below, so one search per tone replaces a search per keyword
+    pos_count = 1 if _POSITIVE_RE.search(text_lower) else 0
+    neg_count = 1 if _NEGATIVE_RE.search(text_lower) else 0
+    anger_count = 1 if _ANGER_RE.search(text_lower) else 0
+    app_count = 1 if _APPRECIATION_RE.search(text_lower) else 0
+    has_mixed = _MIXED_RE.search(text_lower) is not None
 
     # Determine sentiment based on counts (prioritize stronger emotions)
     if anger_count > 0:
@@ -58,26 +86,26 @@ def analyze_sentiment_keywords(text):
 # --- END OF FUNCTION ---
 
 
-def extract_keywords(all_text, top_n=10):
+def extract_keywords(texts, top_n=10):
     """
     Extracts top single keywords and two-word phrases (bigrams).
+    `texts` is an iterable of mention texts (a single string also works); each one is
+    tokenized and counted on its own, so no joined corpus is built and phrases never
+    span two mentions.
     """
-    # Tokenize the text
-    tokens = nltk.word_tokenize(all_text.lower())
-
-    # Filter tokens: keep words longer than 2 chars, alphabetic, and not in stop_words
-    filtered_tokens = [
-        t for t in tokens
-        if len(t) > 2 and t.isalpha() and t not in stop_words
-    ]
-
-    # --- Single Word Frequency ---
-    unigram_freq = FreqDist(filtered_tokens)
-
-    # --- Phrase (Bigram) Frequency ---
-    finder = BigramCollocationFinder.from_words(filtered_tokens)
-    bigram_measures = BigramAssocMeasures()
-    bigram_freq = finder.ngram_fd
+    if isinstance(texts, str): texts = [texts]
+    unigram_freq = Counter()
+    bigram_freq = Counter()
+
+    for text in texts:
+        # Tokenize, then keep words longer than 2 chars, alphabetic, and not in stop_words
+        filtered_tokens = [
+            t for t in _WORD_RE.findall((text or "").lower())
+            if len(t) > 2 and t.isalpha() and t not in stop_words
+        ]
+        # --- Single Word and Phrase (Bigram) Frequency ---
+        unigram_freq.update(filtered_tokens)
+        bigram_freq.update(zip(filtered_tokens, filtered_tokens[1:]))
 
     # --- Combine Frequencies ---
     combined_freq = Counter()
@@ -115,6 +143,26 @@ def filter_by_hours(full_data, hours):
             filtered.append(item)
     return filtered
 
+def _as_brand_list(mentioned):
+    """Normalizes an item's 'mentioned_brands' (list, single string, or missing) to a list."""
+    if isinstance(mentioned, list): return mentioned
+    if isinstance(mentioned, str): return [mentioned] # Handle if it's just a single string
+    return []
+
+def compute_sov(full_data, all_brands):
+    """
+    Share of voice (%) for each brand in `all_brands`, in that order.
+    Each mention counts once for every tracked brand it names.
+    """
+    tracked = set(all_brands)
+    # One counting pass over the unique tracked brands of every mention
+    brand_counts = Counter(chain.from_iterable(tracked.intersection(_as_brand_list(item.get('mentioned_brands'))) for item in full_data))
+    counts = np.fromiter((brand_counts[b] for b in all_brands), dtype=float, count=len(all_brands))
+
+    # Total mentions contributing to SOV
+    total_sov_mentions = counts.sum()
+    return (counts / total_sov_mentions * 100 if total_sov_mentions > 0 else counts).tolist()
+
 def compute_kpis(full_data, campaign_messages, industry=None, hours=None, brand=None):
     """
     Calculates all KPIs based on the provided data.
@@ -147,22 +195,7 @@ def compute_kpis(full_data, campaign_messages, industry=None, hours=None, brand=
         brand = all_brands_list[0] # Assign a default if none provided but mentions exist
 
     # --- SOV Calculation ---
-    brand_counts = Counter()
-    for item in full_data:
-        mentioned = item.get('mentioned_brands', [])
-        # Count each brand mentioned in the item
-        present_brands = set()
-        if isinstance(mentioned, list):
-            present_brands.update(b for b in mentioned if b in all_brands_list)
-        elif isinstance(mentioned, str) and mentioned in all_brands_list:
-            present_brands.add(mentioned)
-        # Increment count for each unique brand present in this mention
-        for b in present_brands:
-             brand_counts[b] += 1
-
-    # Total mentions contributing to SOV
-    total_sov_mentions = sum(brand_counts.values())
-    sov = [(brand_counts[b] / total_sov_mentions * 100) if total_sov_mentions > 0 else 0 for b in all_brands_list]
+    sov = compute_sov(full_data, all_brands_list)
 
     # --- Sentiment Ratio ---
     sentiment_counts = Counter(tones)
@@ -19,9 +19,8 @@ def handle_login():
         if submit:
             if username == 'user' and password == 'pass':
                 st.session_state['logged_in'] = True
-                st.success("Login successful! Redirecting to dashboard...")
-                # Use st.rerun() to force the script to check session_state again
-                st.rerun()
+                # switch_page reruns straight into the dashboard (no extra st.rerun() pass through this page)
+                st.switch_page("pages/dashboard.py")
             else:
                 st.error("Invalid username or password.")
 
@@ -70,9 +69,5 @@ else:
     # This is a bit of a hack, but simpler than switch_page
     # st.switch_page("pages/dashboard.py")
     
-    # A better pattern:
-    st.success("Logged in. Redirecting to your dashboard...")
-    # Give a moment for the user to see the success message
-    import time
-    time.sleep(1)
+    # A better pattern: redirect immediately (no sleep, nothing else on this page renders)
     st.switch_page("pages/dashboard.py")
@@ -3,6 +3,10 @@ import boto3
 import json
 import os
 import streamlit as st
+from analysis import compute_sov
+
+# Per-call model tracing is noisy (one line per mention); set FN_DEBUG=1 to enable it
+DEBUG = bool(os.getenv("FN_DEBUG"))
 
 # --- Bedrock Client Setup ---
 @st.cache_resource
@@ -138,7 +142,7 @@ def invoke_model_sequentially(prompt, model_list, max_tokens, temperature):
     last_error = "No models attempted or all skipped."
 
     for model_id in model_list:
-        print(f"Attempting model: {model_id}")
+        if DEBUG: print(f"Attempting model: {model_id}")
         body = None
         parse_func = None
 
@@ -178,7 +182,7 @@ def invoke_model_sequentially(prompt, model_list, max_tokens, temperature):
             result_text = parse_func(response_body) if parse_func else None
 
             if result_text is not None and result_text != "":
-                print(f"Success with model: {model_id}")
+                if DEBUG: print(f"Success with model: {model_id}")
                 return result_text
             else:
                 print(f"Model {model_id} returned empty or failed to parse response: {response_body}")
@@ -253,15 +257,7 @@ def generate_llm_report_summary(kpis, top_keywords, articles, brand, competitors
     sov_values = kpis.get('sov', [])
     # Recalculate SOV mapping if needed
     if len(sov_values) != len(all_brands_list):
-         brand_counts = Counter()
-         for item in articles: # Use 'articles' passed to this function
-              mentioned = item.get('mentioned_brands', [])
-              present_brands = set()
-              if isinstance(mentioned, list): present_brands.update(b for b in mentioned if b in all_brands_list)
-              elif isinstance(mentioned, str) and mentioned in all_brands_list: present_brands.add(mentioned)
-              for b in present_brands: brand_counts[b] += 1
-         total_sov_mentions = sum(brand_counts.values())
-         sov_values = [(brand_counts[b] / total_sov_mentions * 100) if total_sov_mentions > 0 else 0 for b in all_brands_list]
+         sov_values = compute_sov(articles, all_brands_list) # Use 'articles' passed to this function
 
     if len(sov_values) == len(all_brands_list):
         sov_items = [f"{b}: {s:.1f}%" for b, s in zip(all_brands_list, sov_values)]
@@ -1,16 +1,29 @@
 # pages/dashboard.py
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import numpy as np
 import traceback
 from dotenv import load_dotenv
 import io # <-- IMPORT IO FOR EXCEL
-from collections import Counter # Import Counter for SOV recalc
 import os # Import os for getenv
+import sys
+import importlib
+import tempfile # Parquet spill files for large runs
+import atexit
+import hashlib
+import json
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # --- IMPORTANT: Use relative imports from the root ---
 # Load .env first, *then* import other modules
-load_dotenv()
+@st.cache_resource
+def _load_env():
+    """ Loads .env once per process (find_dotenv walks up the directory tree on every call). """
+    return load_dotenv()
+
+_load_env()
 
 # --- ADD CUSTOM CSS HERE ---
 # Define your brand colors (adjust hex codes as needed)
@@ -48,6 +61,7 @@ custom_css = f"""
     .streamlit-expanderHeader {{ background-color: {BLACK}; color: {GOLD}; border: 1px solid {GOLD}; border-radius: 5px; }}
 
     /* --- CSS for KPI Boxes --- */
+    .kpi-row {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(180px, 1fr)); gap: 1rem; }}
     .kpi-box {{
         border: 1px solid {BEIGE}; border-radius: 5px; padding: 15px;
         text-align: center; margin-bottom: 10px; background-color: {DARK_BG};
@@ -67,15 +81,173 @@ custom_css = f"""
 st.markdown(custom_css, unsafe_allow_html=True)
 
 
-try:
-    from .. import analysis
-    from .. import report_gen
-    from .. import scraper
-    from .. import bedrock as bedrock_llm # Use alias for clarity
-    from .. import servicenow_integration
-except ImportError:
-    # Fallback needed if running dashboard.py directly during development
-    import analysis, report_gen, scraper, bedrock as bedrock_llm, servicenow_integration
+# --- Project modules ---
+@st.cache_resource
+def _load_modules():
+    """ Imports the project modules once per process; a failed import is returned as its exception (and not kept cached). """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if root not in sys.path: sys.path.insert(0, root) # Pages run as scripts, so import from the project root
+    modules = {}
+    for name in ('analysis', 'scraper', 'bedrock', 'servicenow_integration'): # report_gen is imported on first report
+        try: modules[name] = importlib.import_module(name)
+        except Exception as e: modules[name] = e; print(f"[Import Error] {name}: {e}")
+    return modules
+
+_modules = _load_modules()
+_failed_modules = {name: err for name, err in _modules.items() if isinstance(err, Exception)}
+if _failed_modules:
+    _load_modules.clear() # Don't keep the failure cached: the next rerun retries the imports
+    st.error("Failed to load modules: " + "; ".join(f"{name} ({err})" for name, err in _failed_modules.items())); st.stop()
+analysis = _modules['analysis']; scraper = _modules['scraper']
+bedrock_llm = _modules['bedrock']; servicenow_integration = _modules['servicenow_integration'] # Use alias for clarity
+
+
+# --- Cached scraping ---
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_fetch_all(brand, hours, competitors_tuple, industry):
+    """ Memoizes fetch_all per (brand, hours, competitors, industry) for 5 minutes; only saves re-reading the scraper's disk cache, whose SCRAPER_CACHE_TTL_MINUTES governs freshness. """
+    return scraper.fetch_all(brand=brand, time_frame=hours, competitors=list(competitors_tuple), industry=industry)
+
+
+# --- Per-corpus memoization ---
+SENTIMENT_MEMO_SIZE = 32
+SENTIMENT_WORKERS = 8 # Concurrent Bedrock sentiment calls per run
+
+
+def corpus_hash(texts):
+    """ blake2b digest of the mention texts; memo key for per-corpus work. """
+    digest = hashlib.blake2b(digest_size=16)
+    for text in texts: digest.update(text.encode('utf-8', 'ignore')); digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def json_hash(obj):
+    """ blake2b digest of `obj` as sorted JSON; cache key for dicts/records st.cache_data shouldn't hash itself. """
+    return hashlib.blake2b(json.dumps(obj, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+
+@st.cache_resource
+def _sentiment_memo():
+    """ Process-wide {corpus_hash: [sentiments]}, only filled by runs with no LLM failures. """
+    return OrderedDict()
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def cached_keywords(corpus_key, _texts, top_n=10):
+    """ Memoizes extract_keywords on the corpus hash (`_texts` is skipped by the hasher). """
+    return analysis.extract_keywords(_texts, top_n=top_n)
+
+
+# --- Cached chart figures ---
+STATIC_CHART_CONFIG = {"staticPlot": True, "displayModeBar": False} # Read-only charts: no hover/zoom handlers or modebar
+SENTIMENT_COLORS = {'positive': 'green', 'appreciation': 'blue', 'neutral': 'grey', 'mixed': 'orange', 'negative': 'red', 'anger': 'darkred'}
+
+
+@st.cache_data(show_spinner=False)
+def build_sentiment_pie(sentiment_items):
+    """ Sentiment donut as a Plotly figure dict; `sentiment_items` is a tuple of (tone, percent). """
+    import plotly.express as px # Deferred: only needed once there are KPIs to chart
+    pie_data = pd.Series(dict(sentiment_items), name='Percent', dtype=float).rename_axis('Sentiment').reset_index()
+    return px.pie(pie_data, names='Sentiment', values='Percent', title="AI Sentiment Distribution", color='Sentiment', color_discrete_map=SENTIMENT_COLORS, hole=0.4).to_dict()
+
+
+@st.cache_data(show_spinner=False)
+def build_sov_bar(brands, sov_values):
+    """ SOV bar chart as a Plotly figure dict; tuple args keep the cache key hashable. """
+    import plotly.express as px
+    sov_df = pd.DataFrame({'Brand': np.asarray(brands), 'Share of Voice (%)': np.asarray(sov_values, dtype=np.float32)}) # float32 is plenty for a %
+    return px.bar(sov_df, x='Brand', y='Share of Voice (%)', title="Share of Voice (SOV)", color='Brand').to_dict()
+
+
+# --- Large-run storage ---
+# Runs with this many mentions are flushed to a temp Parquet file; session_state only keeps the path.
+PARQUET_THRESHOLD = 5000
+EXCEL_COLUMNS = {'date': 'Date', 'sentiment': 'Sentiment', 'source': 'Source', 'text': 'Mention Text', 'link': 'Link', 'likes': 'Likes', 'comments': 'Comments'}
+EXCEL_DEFAULTS = {'date': 'N/A', 'sentiment': 'N/A', 'source': 'N/A', 'text': '', 'link': '#', 'likes': 0, 'comments': 0}
+
+
+@st.cache_resource
+def _parquet_files():
+    """ Process-wide set of temp Parquet paths, deleted at interpreter exit. """
+    paths = set()
+    def _cleanup():
+        for path in list(paths):
+            try: os.remove(path)
+            except OSError: pass
+    atexit.register(_cleanup)
+    return paths
+
+
+def discard_full_data():
+    """ Drops the current run's mentions, deleting its Parquet file if one was written. """
+    path = st.session_state.get('full_data_path')
+    if path:
+        _parquet_files().discard(path)
+        try: os.remove(path)
+        except OSError: pass
+    st.session_state.full_data = []; st.session_state.full_data_path = None
+
+
+def store_full_data(records):
+    """ Keeps small runs in session_state; large runs go to a zstd Parquet file on disk. """
+    discard_full_data()
+    if len(records) < PARQUET_THRESHOLD:
+        st.session_state.full_data = records; return
+    with tempfile.NamedTemporaryFile(suffix='.parquet', delete=False) as tmp: path = tmp.name
+    pd.DataFrame.from_records(records).to_parquet(path, compression='zstd')
+    _parquet_files().add(path)
+    st.session_state.full_data_path = path
+
+
+def has_full_data():
+    """ True once a run has stored mentions (in memory or on disk). """
+    return bool(st.session_state.get('full_data_path') or st.session_state.get('full_data'))
+
+
+def load_full_data():
+    """ Returns the run's mentions as a list of dicts, reloading from Parquet if needed. """
+    path = st.session_state.get('full_data_path')
+    if not path: return st.session_state.get('full_data', [])
+    df = pd.read_parquet(path)
+    if 'mentioned_brands' in df: # Parquet list columns come back as arrays
+        df['mentioned_brands'] = df['mentioned_brands'].map(lambda v: list(v) if v is not None else [])
+    return df.to_dict('records')
+
+
+def load_mentions_df(columns):
+    """ Column-pruned DataFrame view of the run's mentions (reads only `columns` from Parquet). """
+    path = st.session_state.get('full_data_path')
+    if path: return pd.read_parquet(path, columns=columns)
+    return pd.DataFrame.from_records(st.session_state.get('full_data', []), columns=columns)
+
+
+# --- Cached KPIs ---
+@st.cache_data(ttl=300, max_entries=32, show_spinner=False)
+def cached_kpis(data_key, campaign_tuple, industry, hours, brand, _full_data):
+    """ Memoizes compute_kpis per mention-data hash; ttl because the hours filter is relative to now. """
+    return analysis.compute_kpis(full_data=_full_data, campaign_messages=list(campaign_tuple), industry=industry, hours=hours, brand=brand)
+
+
+# --- Cached reports ---
+@st.cache_data(max_entries=8, show_spinner=False)
+def cached_report(kpis_key, keywords_tuple, brand, competitors_tuple, timeframe, corpus_key, ai_summary, _kpis, _full_data):
+    """ Memoizes (md, pdf_bytes) per report inputs, including the resolved AI summary (so a retried summary re-renders); `_kpis`/`_full_data` are keyed by their hashes. """
+    import report_gen # Deferred: pulls in reportlab, only needed once a report is requested
+    return report_gen.generate_report(kpis=_kpis, top_keywords=list(keywords_tuple), full_articles_data=_full_data, brand=brand, competitors=list(competitors_tuple), timeframe_hours=timeframe, include_json=False, ai_summary=ai_summary)
+
+
+def build_excel_bytes(df_excel):
+    """ Serializes the mentions sheet to .xlsx bytes; touches no st.* so it can run on a worker thread. """
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer: df_excel.to_excel(writer, index=False, sheet_name='Mentions')
+    return output.getvalue()
+
+
+def classify_sentiment(text):
+    """ LLM sentiment for one mention with keyword fallback; returns (sentiment, llm_ok). """
+    llm_sentiment = bedrock_llm.get_llm_sentiment(text)
+    if llm_sentiment is not None: return llm_sentiment, True
+    return analysis.analyze_sentiment_keywords(text), False
 
 
 def run_analysis(brand, time_range_text, hours, competitors, industry, campaign_messages):
@@ -83,41 +255,48 @@ def run_analysis(brand, time_range_text, hours, competitors, industry, campaign_
     try:
         # 1. Scrape Data
         with st.spinner(f"Scraping the web for '{brand}' ({time_range_text})..."):
-            scraped_data = scraper.fetch_all(brand=brand, time_frame=hours, competitors=competitors, industry=industry)
-        if not scraped_data['full_data']:
+            if st.session_state.pop('force_rescrape', False): # Set by "Clear Cached Results": bypass the disk cache too
+                scraped_data = scraper.fetch_all(brand=brand, time_frame=hours, competitors=competitors, industry=industry, use_cache=False)
+            else: scraped_data = cached_fetch_all(brand, hours, tuple(competitors), industry)
+        temp_data = scraped_data.get('full_data', []) # Bound once; reused by sentiment, KPIs and keywords below
+        if not temp_data:
             st.warning("No mentions found. Try a broader timeframe or different keywords."); st.stop()
 
-        # 2. Sentiment Analysis with Fallback
-        st.write("🧠 Performing Sentiment Analysis...")
-        temp_data = scraped_data['full_data']
-        progress_bar = st.progress(0, text="Analyzing sentiment (0%)...")
-        llm_failed_count = 0
-        total_items = len(temp_data)
-        for i, item in enumerate(temp_data):
-            llm_sentiment = bedrock_llm.get_llm_sentiment(item.get('text', ''))
-            item['sentiment'] = llm_sentiment if llm_sentiment is not None else analysis.analyze_sentiment_keywords(item.get('text', ''))
-            if llm_sentiment is None: llm_failed_count += 1
-            progress_percent = (i + 1) / total_items
-            progress_text = f"Analyzing sentiment ({progress_percent * 100:.0f}%)..." + (f" (LLM errors: {llm_failed_count})" if llm_failed_count > 0 else "")
-            progress_bar.progress(progress_percent, text=progress_text)
-        progress_bar.empty(); st.session_state.full_data = temp_data
-        if llm_failed_count > 0: st.warning(f"⚠️ AI connection failed for {llm_failed_count}/{total_items} items. Used keyword fallback.")
+        # 2. Sentiment Analysis with Fallback (memoized per corpus)
+        corpus_key = corpus_hash(item.get('text', '') for item in temp_data)
+        st.session_state.corpus_key = corpus_key
+        sentiment_memo = _sentiment_memo()
+        cached_sentiments = sentiment_memo.get(corpus_key)
+        if cached_sentiments is not None:
+            for item, sentiment in zip(temp_data, cached_sentiments): item['sentiment'] = sentiment
+        else:
+            st.write("🧠 Performing Sentiment Analysis...")
+            progress_bar = st.progress(0, text="Analyzing sentiment (0%)...")
+            llm_failed_count = 0
+            total_items = len(temp_data)
+            # Bedrock calls are I/O-bound: fan out, attaching the script context so st.* warnings still render
+            with ThreadPoolExecutor(max_workers=SENTIMENT_WORKERS, initializer=add_script_run_ctx, initargs=(None, get_script_run_ctx())) as pool:
+                results = pool.map(classify_sentiment, (item.get('text', '') for item in temp_data))
+                for i, (item, (sentiment, llm_ok)) in enumerate(zip(temp_data, results)):
+                    item['sentiment'] = sentiment
+                    if not llm_ok: llm_failed_count += 1
+                    progress_percent = (i + 1) / total_items
+                    progress_text = f"Analyzing sentiment ({progress_percent * 100:.0f}%)..." + (f" (LLM errors: {llm_failed_count})" if llm_failed_count > 0 else "")
+                    progress_bar.progress(progress_percent, text=progress_text)
+            progress_bar.empty()
+            if llm_failed_count > 0: st.warning(f"⚠️ AI connection failed for {llm_failed_count}/{total_items} items. Used keyword fallback.")
+            else: # Only cache clean runs so a later click can retry the LLM
+                sentiment_memo[corpus_key] = [item['sentiment'] for item in temp_data]
+                while len(sentiment_memo) > SENTIMENT_MEMO_SIZE: sentiment_memo.popitem(last=False)
+        store_full_data(temp_data)
 
         # 3. Compute KPIs
         with st.spinner("Calculating KPIs..."):
-            st.session_state.kpis = analysis.compute_kpis(full_data=st.session_state.full_data, campaign_messages=campaign_messages, industry=industry, hours=hours, brand=brand)
+            st.session_state.kpis = cached_kpis(json_hash(temp_data), tuple(campaign_messages), industry, hours, brand, temp_data)
 
         # 4. Extract Keywords/Phrases
-        all_text = " ".join([item["text"] for item in st.session_state.full_data])
-        if hasattr(analysis, 'stop_words') and isinstance(analysis.stop_words, set):
-            # Add brand and competitors to stopwords dynamically
-            current_stop_words = analysis.stop_words.copy() # Avoid modifying the global set directly if re-running analysis
-            current_stop_words.add(brand.lower()); [current_stop_words.add(c.lower()) for c in competitors]
-            # Override the global stopwords *during* this function call might be complex
-            # Instead, pass the updated set if the function allows, or modify the function
-            # For simplicity here, we'll rely on the modification done earlier (less ideal if re-running with different brands w/o restart)
-            # A better approach would be to pass stop_words to extract_keywords
-        st.session_state.top_keywords = analysis.extract_keywords(all_text, top_n=10) # Assuming extract_keywords uses the global analysis.stop_words
+        st.session_state.top_keywords = cached_keywords(corpus_key, (item.get("text", "") for item in temp_data), top_n=10) # extract_keywords filters with analysis.stop_words
+        st.session_state.top_keywords_df = pd.DataFrame(st.session_state.top_keywords, columns=['Keyword/Phrase', 'Frequency']) # Built once per run, not per rerun
 
         st.success("Analysis complete!")
 
@@ -142,6 +321,7 @@ def display_dashboard(brand, competitors, time_range_text, thresholds): # <-- Ad
     """ Displays KPIs with conditional styling, charts, tables, and reports. """
     if not st.session_state.kpis:
         st.info("Click 'Run Analysis' to load your brand data."); return
+    import plotly.graph_objects as go # Deferred until there are results to chart
 
     # --- Display KPIs with Threshold Styling ---
     st.subheader("Key Performance Indicators")
@@ -161,12 +341,10 @@ def display_dashboard(brand, competitors, time_range_text, thresholds): # <-- Ad
     eng_class = "good" if eng_val >= eng_threshold else "bad"
     reach_class = "good" if reach_val >= reach_threshold else "bad"
 
-    # Display using Markdown boxes
-    col1, col2, col3, col4 = st.columns(4)
-    with col1: st.markdown(f'<div class="kpi-box {mis_class}"><div class="label">Media Impact (MIS)</div><div class="value">{mis_val:.0f}</div></div>', unsafe_allow_html=True)
-    with col2: st.markdown(f'<div class="kpi-box {mpi_class}"><div class="label">Msg Penetration (MPI)</div><div class="value">{mpi_val:.1f}%</div></div>', unsafe_allow_html=True)
-    with col3: st.markdown(f'<div class="kpi-box {eng_class}"><div class="label">Avg Social Engagement</div><div class="value">{eng_val:.1f}</div></div>', unsafe_allow_html=True)
-    with col4: st.markdown(f'<div class="kpi-box {reach_class}"><div class="label">Total Reach</div><div class="value">{reach_val:,}</div></div>', unsafe_allow_html=True)
+    # Display using Markdown boxes: one grid element instead of four columns with a markdown each
+    kpi_boxes = [(mis_class, "Media Impact (MIS)", f"{mis_val:.0f}"), (mpi_class, "Msg Penetration (MPI)", f"{mpi_val:.1f}%"),
+                 (eng_class, "Avg Social Engagement", f"{eng_val:.1f}"), (reach_class, "Total Reach", f"{reach_val:,}")]
+    st.markdown('<div class="kpi-row">' + "".join(f'<div class="kpi-box {css}"><div class="label">{label}</div><div class="value">{value}</div></div>' for css, label, value in kpi_boxes) + '</div>', unsafe_allow_html=True)
     # --- Update caption ---
     st.caption(f"Thresholds (Good ≥) MIS: {mis_threshold} | MPI: {mpi_threshold}% | Engagement: {eng_threshold} | Reach: {reach_threshold:,}")
 
@@ -174,10 +352,8 @@ def display_dashboard(brand, competitors, time_range_text, thresholds): # <-- Ad
     st.subheader("Visual Analysis")
     sentiment_ratio = kpis.get("sentiment_ratio", {})
     if sentiment_ratio:
-        pie_data = pd.DataFrame({'Sentiment': list(sentiment_ratio.keys()), 'Percent': list(sentiment_ratio.values())})
-        color_map = {'positive': 'green', 'appreciation': 'blue', 'neutral': 'grey', 'mixed': 'orange', 'negative': 'red', 'anger': 'darkred'}
-        fig_pie = px.pie(pie_data, names='Sentiment', values='Percent', title="AI Sentiment Distribution", color='Sentiment', color_discrete_map=color_map, hole=0.4)
-        st.plotly_chart(fig_pie, use_container_width=True)
+        fig_pie = go.Figure(build_sentiment_pie(tuple(sentiment_ratio.items())))
+        st.plotly_chart(fig_pie, use_container_width=True, config=STATIC_CHART_CONFIG)
     else: st.write("No sentiment data.")
 
     all_brands = kpis.get("all_brands", [brand] + competitors)
@@ -185,62 +361,66 @@ def display_dashboard(brand, competitors, time_range_text, thresholds): # <-- Ad
     # --- Robust SOV Recalculation ---
     if len(sov_values) != len(all_brands):
         print("Warning: SOV length mismatch, recalculating based on current data.")
-        brand_counts = Counter()
-        relevant_mentions_count = 0
-        for item in st.session_state.full_data: # Use current full_data
-             mentioned = item.get('mentioned_brands', [])
-             present_brands_in_item = set()
-             if isinstance(mentioned, list): present_brands_in_item.update(b for b in mentioned if b in all_brands)
-             elif isinstance(mentioned, str) and mentioned in all_brands: present_brands_in_item.add(mentioned)
-             if present_brands_in_item: # Only count mentions that include at least one tracked brand for SOV base
-                 relevant_mentions_count +=1
-                 for b in present_brands_in_item: brand_counts[b] += 1 # Count appearances
-        # Base SOV on total appearances across relevant mentions
-        total_appearances = sum(brand_counts.values())
-        sov_values = [(brand_counts[b] / total_appearances * 100) if total_appearances > 0 else 0 for b in all_brands]
+        # One columnar pass: explode each mention's brands, keep tracked ones, count each brand once per mention
+        mentioned = load_mentions_df(['mentioned_brands'])['mentioned_brands'].explode()
+        mentioned = mentioned[mentioned.isin(all_brands)]
+        brand_counts = mentioned.reset_index().drop_duplicates()['mentioned_brands'].value_counts()
+        # Align to all_brands (zero-filled) and base SOV on total appearances across relevant mentions
+        counts = brand_counts.reindex(all_brands, fill_value=0).to_numpy(dtype=float)
+        total_appearances = counts.sum()
+        sov_values = (counts / total_appearances * 100 if total_appearances > 0 else counts).tolist()
         st.session_state.kpis['sov'] = sov_values # Update kpis in state if recalculated
 
-    sov_df = pd.DataFrame({'Brand': all_brands, 'Share of Voice (%)': sov_values})
-    fig_sov = px.bar(sov_df, x='Brand', y='Share of Voice (%)', title="Share of Voice (SOV)", color='Brand')
-    st.plotly_chart(fig_sov, use_container_width=True)
+    fig_sov = go.Figure(build_sov_bar(tuple(all_brands), tuple(sov_values)))
+    st.plotly_chart(fig_sov, use_container_width=True, config=STATIC_CHART_CONFIG)
 
     # --- Data Tables (Vertical Layout) ---
     st.subheader("Detailed Mentions")
     st.markdown("**Top Keywords & Phrases**")
-    top_keywords = st.session_state.top_keywords
-    if top_keywords: st.dataframe(pd.DataFrame(top_keywords, columns=['Keyword/Phrase', 'Frequency']), use_container_width=True)
+    top_keywords_df = st.session_state.top_keywords_df
+    if top_keywords_df is not None and not top_keywords_df.empty: st.dataframe(top_keywords_df, use_container_width=True)
     else: st.write("- No keywords/phrases.")
 
     st.markdown("**Recent Mentions (All Brands)**")
-    if st.session_state.full_data:
-        display_data = [{'Sentiment': item.get('sentiment', 'N/A'), 'Source': item.get('source', 'N/A'), 'Mention': item.get('text', '')[:150]+"...", 'Link': item.get('link', '#')} for item in st.session_state.full_data[:30]]
-        st.dataframe(pd.DataFrame(display_data), column_config={"Link": st.column_config.LinkColumn("Link", display_text="Source Link")}, use_container_width=True, hide_index=True)
+    if has_full_data():
+        recent = load_mentions_df(['sentiment', 'source', 'text', 'link']).head(30)
+        display_df = pd.DataFrame({'Sentiment': recent['sentiment'].fillna('N/A'), 'Source': recent['source'].fillna('N/A'), 'Mention': recent['text'].fillna('').str[:150] + "...", 'Link': recent['link'].fillna('#')})
+        st.dataframe(display_df, column_config={"Link": st.column_config.LinkColumn("Link", display_text="Source Link")}, use_container_width=True, hide_index=True)
     else: st.write("No mentions.")
 
     # --- Report Generation & Sending ---
+    render_report_section(brand, competitors, time_range_text)
+
+
+@st.fragment
+def render_report_section(brand, competitors, time_range_text):
+    """ Report build/download/email UI; as a fragment its buttons rerun only this section, not the charts above. """
     st.subheader("Generate & Send Report")
     recipient_email = st.text_input("Enter Email to Send Reports To:", placeholder="your.email@example.com", key="recipient_email_input")
 
     if st.button("Generate Reports for Email/Download", use_container_width=True, key="generate_reports"):
-        if not st.session_state.kpis or not st.session_state.full_data:
+        if not st.session_state.kpis or not has_full_data():
             st.warning("Please run analysis first."); st.session_state.report_generated = False
         else:
+            full_data = load_full_data()
             st.session_state.report_generated = False; pdf_generated = False; excel_generated = False; ai_summary = ""
-            with st.spinner("Building PDF report..."):
-                try:
-                    # Pass competitors to the AI summary function
-                    ai_summary = bedrock_llm.generate_llm_report_summary(st.session_state.kpis, st.session_state.top_keywords, st.session_state.full_data, brand, competitors) # <-- Pass competitors
-                    st.session_state.ai_summary_text = ai_summary
-                    md, pdf_bytes = report_gen.generate_report(kpis=st.session_state.kpis, top_keywords=st.session_state.top_keywords, full_articles_data=st.session_state.full_data, brand=brand, competitors=competitors, timeframe_hours=time_range_text, include_json=False)
-                    st.session_state.pdf_report_bytes = pdf_bytes; pdf_generated = True
-                except Exception as e: st.error(f"Failed PDF generation: {e}\n{traceback.format_exc()}")
-            with st.spinner("Building Excel mentions file..."):
-                try:
-                    excel_data = [{'Date': item.get('date', 'N/A'), 'Sentiment': item.get('sentiment', 'N/A'), 'Source': item.get('source', 'N/A'), 'Mention Text': item.get('text', ''), 'Link': item.get('link', '#'), 'Likes': item.get('likes', 0), 'Comments': item.get('comments', 0)} for item in st.session_state.full_data]
-                    df_excel = pd.DataFrame(excel_data); output = io.BytesIO()
-                    with pd.ExcelWriter(output, engine='openpyxl') as writer: df_excel.to_excel(writer, index=False, sheet_name='Mentions')
-                    st.session_state.excel_report_bytes = output.getvalue(); excel_generated = True
-                except Exception as e: st.error(f"Failed Excel generation: {e}")
+            # The Excel sheet doesn't depend on the PDF, so serialize it on a worker while the PDF/AI summary runs
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                try: excel_future = pool.submit(build_excel_bytes, load_mentions_df(list(EXCEL_COLUMNS)).fillna(EXCEL_DEFAULTS).rename(columns=EXCEL_COLUMNS))
+                except Exception as e: excel_future = None; st.error(f"Failed Excel generation: {e}")
+                with st.spinner("Building PDF report..."):
+                    try:
+                        import report_gen # Memoized summary; passed into the report (and its cache key) so the PDF shows this exact text
+                        ai_summary = report_gen.get_ai_summary(st.session_state.kpis, st.session_state.top_keywords, full_data, brand, competitors)
+                        st.session_state.ai_summary_text = ai_summary
+                        kpis = st.session_state.kpis
+                        md, pdf_bytes = cached_report(json_hash(kpis), tuple(map(tuple, st.session_state.top_keywords)), brand, tuple(competitors), time_range_text, st.session_state.corpus_key, ai_summary, kpis, full_data)
+                        st.session_state.pdf_report_bytes = pdf_bytes; pdf_generated = True
+                    except Exception as e: st.error(f"Failed PDF generation: {e}\n{traceback.format_exc()}")
+                if excel_future is not None:
+                    with st.spinner("Building Excel mentions file..."):
+                        try: st.session_state.excel_report_bytes = excel_future.result(); excel_generated = True
+                        except Exception as e: st.error(f"Failed Excel generation: {e}")
             if pdf_generated and excel_generated:
                 st.session_state.report_generated = True; st.success("Reports Generated Successfully!")
                 with st.expander("View AI Summary & Recommendations", expanded=True): st.markdown(st.session_state.ai_summary_text) # Display stored summary
@@ -251,10 +431,10 @@ def display_dashboard(brand, competitors, time_range_text, thresholds): # <-- Ad
         st.markdown("---")
         col_dl_pdf, col_dl_excel, col_email = st.columns(3)
         with col_dl_pdf:
-            if st.session_state.get('pdf_report_bytes'): st.download_button("Download PDF", st.session_state.pdf_report_bytes, f"{brand}_Report.pdf", "application/pdf", use_container_width=True, key="pdf_dl")
+            if st.session_state.get('pdf_report_bytes'): st.download_button("Download PDF", st.session_state.pdf_report_bytes, f"{brand}_Report.pdf", "application/pdf", use_container_width=True, key="pdf_dl", on_click="ignore")
             else: st.button("Download PDF", disabled=True, use_container_width=True, help="PDF generation failed.")
         with col_dl_excel:
-            if st.session_state.get('excel_report_bytes'): st.download_button("Download Excel", st.session_state.excel_report_bytes, f"{brand}_Mentions.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", use_container_width=True, key="excel_dl")
+            if st.session_state.get('excel_report_bytes'): st.download_button("Download Excel", st.session_state.excel_report_bytes, f"{brand}_Mentions.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", use_container_width=True, key="excel_dl", on_click="ignore")
             else: st.button("Download Excel", disabled=True, use_container_width=True, help="Excel generation failed.")
         with col_email:
             email_to_send = st.session_state.get("recipient_email_input", "")
@@ -289,8 +469,11 @@ def main():
 
     # Init State
     if 'full_data' not in st.session_state: st.session_state.full_data = []
+    if 'full_data_path' not in st.session_state: st.session_state.full_data_path = None
     if 'kpis' not in st.session_state: st.session_state.kpis = {}
+    if 'corpus_key' not in st.session_state: st.session_state.corpus_key = None
     if 'top_keywords' not in st.session_state: st.session_state.top_keywords = []
+    if 'top_keywords_df' not in st.session_state: st.session_state.top_keywords_df = None
     if 'report_generated' not in st.session_state: st.session_state.report_generated = False
     if 'pdf_report_bytes' not in st.session_state: st.session_state.pdf_report_bytes = None
     if 'excel_report_bytes' not in st.session_state: st.session_state.excel_report_bytes = None
@@ -312,6 +495,8 @@ def main():
             "eng_good": eng_thresh,
             "reach_good": reach_thresh # Added Reach
         }
+        if st.button("Clear Cached Results", use_container_width=True, key="clear_cache_button", help="Force the next analysis to re-scrape."):
+            cached_fetch_all.clear(); st.session_state.force_rescrape = True; st.toast("Scrape cache cleared.")
 
     # Inputs
     st.subheader("Monitoring Setup")
@@ -331,7 +516,7 @@ def main():
     # Run Button
     if st.button("Run Analysis", type="primary", use_container_width=True, key="run_analysis_button"):
         # Clear state vars
-        st.session_state.full_data = []; st.session_state.kpis = {}; st.session_state.top_keywords = []
+        discard_full_data(); st.session_state.kpis = {}; st.session_state.top_keywords = []; st.session_state.top_keywords_df = None
         st.session_state.report_generated = False; st.session_state.pdf_report_bytes = None
         st.session_state.excel_report_bytes = None; st.session_state.ai_summary_text = ""
         run_analysis(brand, time_range_text, hours, competitors, industry, campaign_messages)
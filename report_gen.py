@@ -1,51 +1,172 @@
 # report_gen.py
-import io
-import textwrap
-from datetime import datetime
+import os
+import re
+import json
+import hashlib
+import functools
+import tempfile
+import threading
+import multiprocessing
+import numpy as np
+from collections import OrderedDict
+from itertools import chain, compress, islice, repeat
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from datetime import datetime, timezone
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import Paragraph
+from reportlab.pdfbase import pdfmetrics
 from reportlab.lib.colors import navy, black, gray
-import matplotlib.pyplot as plt
-from bedrock import generate_llm_report_summary as generate_ai_summary
+from reportlab.graphics.shapes import Drawing
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics import renderPDF
+from reportlab.lib import colors
+
+# --- Lazy AI summary import ---
+@functools.cache
+def _get_ai_summary():
+    """Imports the Bedrock summary function on first use (boto3 is only needed for a full report)."""
+    from bedrock import generate_llm_report_summary
+    return generate_llm_report_summary
+
+
+# --- AI summary memo ---
+# Keyed by a content hash of the summary inputs, so re-rendering the same data skips the Bedrock round trip
+AI_SUMMARY_CACHE_SIZE = 32
+_AI_SUMMARY_CACHE = OrderedDict()
+_AI_SUMMARY_LOCK = threading.Lock()
+
+def get_ai_summary(kpis, top_keywords, articles, brand, competitors):
+    """
+    generate_llm_report_summary, memoized per blake2b(JSON of its inputs) with LRU eviction.
+    Error summaries (Bedrock unreachable, all models failed) are not cached so the next call retries.
+    """
+    key = hashlib.blake2b(json.dumps([kpis, top_keywords, articles, brand, competitors], sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+    with _AI_SUMMARY_LOCK: # Called concurrently from per-report summary workers
+        if key in _AI_SUMMARY_CACHE:
+            _AI_SUMMARY_CACHE.move_to_end(key); return _AI_SUMMARY_CACHE[key]
+    summary = _get_ai_summary()(kpis, top_keywords, articles, brand, competitors)
+    if not summary.startswith("**Error:**"):
+        with _AI_SUMMARY_LOCK:
+            _AI_SUMMARY_CACHE[key] = summary
+            if len(_AI_SUMMARY_CACHE) > AI_SUMMARY_CACHE_SIZE: _AI_SUMMARY_CACHE.popitem(last=False)
+    return summary
+
+
+def _ai_summary_or_placeholder(kpis, top_keywords, articles, brand, competitors):
+    """get_ai_summary for the worker pool: never raises, so callers can .result() it more than once."""
+    try: return get_ai_summary(kpis, top_keywords, articles, brand, competitors)
+    except Exception as ai_e:
+        print(f"Error generating AI summary: {ai_e}")
+        return "AI Summary generation failed."
+
+def _submit_ai_summary(kpis, top_keywords, articles, brand, competitors):
+    """
+    Starts the summary on a single-use worker owned by this call (reports never queue behind each other's
+    Bedrock fallbacks) and returns its future. The worker carries the caller's ScriptRunContext, if any,
+    so bedrock's st.error/st.warning still reach the page.
+    """
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx: pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai-summary", initializer=add_script_run_ctx, initargs=(None, ctx))
+    else: pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai-summary")
+    future = pool.submit(_ai_summary_or_placeholder, kpis, top_keywords, articles, brand, competitors)
+    pool.shutdown(wait=False) # The submitted call still runs; the thread exits when it's done
+    return future
+
 
 # --- Helper to create sentiment pie chart ---
+# Vector pie drawn straight onto the canvas (no raster/PNG round trip)
+PIE_SIZE = 150
+_TONE_ORDER = ('positive', 'appreciation', 'neutral', 'mixed', 'negative', 'anger')
+_TONE_COLORS = (colors.green, colors.blue, colors.grey, colors.orange, colors.red, colors.darkred) # Parallel to _TONE_ORDER
+
 def _create_sentiment_pie(sentiment_ratio):
-    labels, sizes, colors = [], [], []
-    color_map = {
-        'positive': 'green', 'appreciation': 'blue',
-        'neutral': 'grey', 'mixed': 'orange',
-        'negative': 'red', 'anger': 'darkred'
-    }
-    sentiment_order = ['positive', 'appreciation', 'neutral', 'mixed', 'negative', 'anger']
-    for tone in sentiment_order:
-        val = float(sentiment_ratio.get(tone, 0))
-        if val > 0.1:
-            labels.append(f"{tone.capitalize()} ({val:.1f}%)")
-            sizes.append(val)
-            colors.append(color_map.get(tone, 'grey'))
-    if not sizes:
-        labels = ['Neutral (100.0%)']; sizes = [100.0]; colors = ['grey']
-
-    fig, ax = plt.subplots(figsize=(4, 4))
-    ax.pie(sizes, labels=None, colors=colors, autopct='%1.1f%%', startangle=90, pctdistance=0.85)
-    ax.axis('equal')
-    buf = io.BytesIO()
-    plt.tight_layout()
-    fig.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-    plt.close(fig)
-    buf.seek(0)
-    return buf
+    """Returns a PIE_SIZE x PIE_SIZE ReportLab Drawing of the sentiment split (shared, treat as read-only)."""
+    return _sentiment_pie(tuple(float(sentiment_ratio.get(tone, 0)) for tone in _TONE_ORDER))
+
+@functools.lru_cache(maxsize=256)
+def _sentiment_pie(tone_values):
+    """Builds the pie for `tone_values` (parallel to _TONE_ORDER); memoized since renderPDF.draw doesn't mutate it."""
+    vals = np.array(tone_values)
+    keep = vals > 0.1 # One vector compare instead of a branch per tone
+    if keep.any(): sizes = vals[keep]; slice_colors = list(compress(_TONE_COLORS, keep))
+    else: sizes = np.array([100.0]); slice_colors = [colors.grey]
+
+    pie = Pie()
+    pie.x = pie.y = 5; pie.width = pie.height = PIE_SIZE - 10
+    pie.data = sizes.tolist()
+    pie.labels = [f"{p:.1f}%" for p in (sizes / sizes.sum() * 100).tolist()] # Percent inside each wedge, like autopct
+    pie.startAngle = 90; pie.direction = 'anticlockwise'
+    pie.simpleLabels = 1
+    pie.slices.strokeWidth = 0.5; pie.slices.strokeColor = colors.white
+    pie.slices.labelRadius = 0.75; pie.slices.fontName = 'Helvetica'; pie.slices.fontSize = 7
+    for i, color in enumerate(slice_colors): pie.slices[i].fillColor = color
+    drawing = Drawing(PIE_SIZE, PIE_SIZE)
+    drawing.add(pie)
+    return drawing
+
+
+# --- Text measuring ---
+@functools.lru_cache(maxsize=4096)
+def _string_width(text, font_name, font_size):
+    """pdfmetrics.stringWidth (the table canvas.stringWidth reads), memoized; sources and " (Link)" repeat a lot."""
+    return pdfmetrics.stringWidth(text, font_name, font_size)
+
+
+# --- Text wrapping ---
+_WORD_BREAK = re.compile(r"\S+")
+
+@functools.lru_cache(maxsize=4096)
+def _wrap(text, width):
+    """
+    Greedy wrap to `width` characters in one regex pass. Splits on whitespace only: runs of whitespace
+    collapse to one space, leading/trailing whitespace is dropped, and hyphens are never break points.
+    Words longer than `width` are broken like textwrap's break_long_words: they fill the rest of the
+    current line and continue on full-width lines, so a long URL can't run past the margin.
+    Memoized (hence the tuple): re-rendering the same data and the memoized AI summary re-wraps identical text.
+    """
+    if len(text) <= width: # Fits on one line (most AI bullets): just normalize whitespace, no word loop
+        line = " ".join(text.split())
+        return (line,) if line else ()
+    lines = []; cur = ""
+    for word in _WORD_BREAK.findall(text):
+        if not cur: cur = word
+        elif len(cur) + 1 + len(word) <= width: cur += " " + word; continue
+        elif len(word) > width:
+            space_left = width - len(cur) - 1
+            if space_left > 0: cur += " " + word[:space_left]; word = word[space_left:]
+            lines.append(cur); cur = word
+        else: lines.append(cur); cur = word; continue
+        while len(cur) > width: lines.append(cur[:width]); cur = cur[width:]
+    if cur: lines.append(cur)
+    return tuple(lines)
+
+
+def _draw_text_lines(c, lines, x, y, font_name, font_size, leading, bottom, top, on_new_page=None):
+    """
+    Draws pre-wrapped `lines` top-down from y, one text object (BT/ET block) per page.
+    Breaks to a new page (restarting at `top`) once y drops below `bottom`; returns the y after the last line.
+    `on_new_page(c, top)`, if given, draws a continuation header after each break and returns the y to continue from.
+    """
+    i = 0
+    while i < len(lines):
+        if y < bottom:
+            c.showPage(); y = top
+            if on_new_page: y = on_new_page(c, y)
+        chunk = lines[i:i + int((y - bottom) // leading) + 1] # Lines that fit before the next break check
+        text = c.beginText(x, y)
+        text.setFont(font_name, font_size, leading)
+        text.textLines(chunk)
+        c.drawText(text)
+        y -= leading * len(chunk); i += len(chunk)
+    return y
 
 
 # --- Helper function to draw a section ---
+MAX_MENTIONS_PER_SECTION = 15 # PDF; the markdown lists show the first 10 of these
+
 def _draw_mention_section(c, y, title, mentions, width, margin_x, height):
     """Draws a titled section with mentions (headline, source, link)."""
-    styles = getSampleStyleSheet()
-    max_y = y # Store starting y for checking space
-
     # Draw Section Title
     c.setFont("Helvetica-Bold", 14)
     c.setFillColor(navy)
@@ -53,17 +174,13 @@ def _draw_mention_section(c, y, title, mentions, width, margin_x, height):
     y -= 20
     c.setFillColor(black)
 
-    mention_count = 0
-    max_mentions_per_section = 15
-
-    for item in mentions:
-        if mention_count >= max_mentions_per_section: break
+    for item in mentions: # Already capped at MAX_MENTIONS_PER_SECTION by generate_report
         headline = item.get('text', 'No Headline')[:200]
         source = item.get('source', 'Unknown Source')
         link = item.get('link', None)
 
-        # Estimate height needed
-        headline_lines = textwrap.wrap(headline, width=80)
+        # Estimate height needed (wrapped once, reused for drawing)
+        headline_lines = _wrap(headline, 80)
         estimated_height = len(headline_lines) * 14 + 14 + 10
         if y < estimated_height + 60: # Check page break
             c.showPage(); y = height - 60
@@ -72,11 +189,7 @@ def _draw_mention_section(c, y, title, mentions, width, margin_x, height):
             c.setFillColor(black)
 
         # Draw Headline
-        c.setFont("Helvetica-Bold", 10)
-        lines = textwrap.wrap(headline, width=80)
-        for line in lines:
-            if y < 60: c.showPage(); y = height - 60; c.setFont("Helvetica-Bold", 10)
-            c.drawString(margin_x, y, line); y -= 12
+        y = _draw_text_lines(c, headline_lines, margin_x, y, "Helvetica-Bold", 10, 12, 60, height - 60)
 
         # Draw Source and Link
         c.setFont("Helvetica", 9); c.setFillColor(gray)
@@ -86,18 +199,18 @@ def _draw_mention_section(c, y, title, mentions, width, margin_x, height):
 
         if link:
              link_text = " (Link)"
-             text_width = c.stringWidth(source_text, "Helvetica", 9)
-             link_x = margin_x + text_width
+             link_x = margin_x + _string_width(source_text, "Helvetica", 9)
+             link_width = _string_width(link_text, "Helvetica", 9)
              c.setFillColor(navy)
-             try: c.linkURL(link, (link_x, y - 2, link_x + c.stringWidth(link_text, "Helvetica", 9), y + 10), relative=1)
+             try: c.linkURL(link, (link_x, y - 2, link_x + link_width, y + 10), relative=1)
              except Exception as link_e: print(f"Warning: Could not create PDF link for {link}: {link_e}")
              c.drawString(link_x, y, link_text)
-             c.line(link_x, y - 1, link_x + c.stringWidth(link_text, "Helvetica", 9), y-1)
+             c.line(link_x, y - 1, link_x + link_width, y-1)
 
         y -= 14; c.setFillColor(black) # Reset color
-        y -= 10; mention_count += 1
+        y -= 10
 
-    if mention_count == 0:
+    if not mentions:
          if y < 60: c.showPage(); y = height - 60
          c.setFont("Helvetica-Oblique", 10)
          c.drawString(margin_x, y, "No specific mentions found in this category.")
@@ -105,20 +218,83 @@ def _draw_mention_section(c, y, title, mentions, width, margin_x, height):
     return y
 
 
+# --- Markdown helpers ---
+# Fixed head of the markdown report, filled in one format_map call
+_MD_HEADER_TEMPLATE = """# Flash Narrative Report: {brand}
+**Period:** {time_text}
+**Generated:** {generated_on}
+
+## Executive Summary
+{ai_summary}
+
+## Key Performance Indicators
+- **Media Impact Score (MIS):** {mis:.0f}
+- **Message Penetration (MPI):** {mpi:.1f}%
+- **Avg. Social Engagement:** {engagement:.1f}
+- **Total Reach:** {reach:,}
+- **Sentiment Ratio:** {sentiment_text}
+
+### Share of Voice (SOV)
+| Brand | SOV (%) |
+|---|---|"""
+
+def _md_mention_list(mentions, empty_text):
+    """Markdown bullets for up to 10 mentions (headline, source link), or `empty_text`."""
+    if not mentions: return empty_text
+    return "\n".join([_MENTION_ROW((item.get('text','No Headline')[:150], item.get('source','Source'), item.get('link','#'))) for item in mentions[:10]]) # Limit in markdown
+
+_MENTION_ROW = "- **%s...** ([%s](%s))".__mod__ # Takes a (headline, source, link) tuple
+_SOV_ROW = "| %s | %.1f |".__mod__ # Takes a (brand, sov) tuple
+_KW_ROW = "- %s: %s".__mod__ # Takes a (word, freq) tuple; keyword rows may arrive as JSON lists
+
+
+# --- Mention categorization ---
+def prepare_articles(articles):
+    """
+    Stores each article's lowercased mentioned_brands as a frozenset under '_mbl' (in place) and returns the list.
+    Call once before generating several reports (e.g. one per brand) from the same articles.
+    """
+    for item in articles: item['_mbl'] = frozenset(mb.lower() for mb in item.get('mentioned_brands', ()))
+    return articles
+
+def _categorize_mentions(articles, brand, competitors):
+    """
+    Splits articles into (brand-only, competitor-only, related) lists in one pass.
+    Related = both the brand and a competitor, or neither.
+    """
+    main_brand_mentions = []; competitor_mentions = []; related_mentions = []
+    buckets = {(True, False): main_brand_mentions, (False, True): competitor_mentions} # Anything else is related
+    lower_brand = brand.lower(); lower_competitors = frozenset(c.lower() for c in competitors)
+    # Lowercase every article's brands up front (reusing prepare_articles' '_mbl'), then test membership with C-level set ops
+    lowered = [item.get('_mbl') or frozenset(mb.lower() for mb in item.get('mentioned_brands', ())) for item in articles]
+    for item, mentioned_brands_lower in zip(articles, lowered):
+        mentions_main = lower_brand in mentioned_brands_lower
+        mentions_comp = not lower_competitors.isdisjoint(mentioned_brands_lower)
+        buckets.get((mentions_main, mentions_comp), related_mentions).append(item)
+    return main_brand_mentions, competitor_mentions, related_mentions
+
+
 # --- Main Report Generation Function ---
-def generate_report(kpis, top_keywords, full_articles_data, brand="Brand", competitors=None, timeframe_hours=24, include_json=False):
+PDF_SPOOL_MAX_SIZE = 512 * 1024 # stream=True PDFs stay in memory up to this size, then spill to a temp file
+
+def report_timestamp():
+    """The "Generated:" stamp shown in reports, e.g. '2024-05-01 14:03 UTC'."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+
+def generate_report(kpis, top_keywords, full_articles_data, brand="Brand", competitors=None, timeframe_hours=24, include_json=False, formats=("md", "pdf"), compress=True, stream=False, generated_on=None, ai_summary=None):
+    """
+    Builds the markdown and PDF reports (plus a JSON summary when include_json=True).
+    The PDF is only rendered when "pdf" is in `formats`; otherwise pdf_bytes is b"" and the return shape is unchanged.
+    `compress` zlib-compresses the PDF page streams; pass False when the bytes get zipped downstream anyway.
+    With stream=True the PDF comes back as a binary file object rewound to 0 instead of bytes (see generate_report_stream).
+    `generated_on` overrides the report timestamp (batches pass one shared value); defaults to now, UTC.
+    Pass an already-resolved `ai_summary` to render that text instead of requesting one from Bedrock.
+    """
     if competitors is None: competitors = []
 
     # --- Categorize Mentions ---
-    main_brand_mentions = []; competitor_mentions = []; related_mentions = []
-    lower_brand = brand.lower(); lower_competitors = {c.lower() for c in competitors}
-    for item in full_articles_data:
-        mentioned_brands_lower = {mb.lower() for mb in item.get('mentioned_brands', [])}
-        mentions_main = lower_brand in mentioned_brands_lower
-        mentions_comp = any(comp in mentioned_brands_lower for comp in lower_competitors)
-        if mentions_main and not mentions_comp: main_brand_mentions.append(item)
-        elif not mentions_main and mentions_comp: competitor_mentions.append(item)
-        else: related_mentions.append(item)
+    main_brand_mentions, competitor_mentions, related_mentions = (
+        mentions[:MAX_MENTIONS_PER_SECTION] for mentions in _categorize_mentions(full_articles_data, brand, competitors))
 
     # --- Get KPI data ---
     sentiment_ratio = kpis.get('sentiment_ratio', {})
@@ -126,159 +302,145 @@ def generate_report(kpis, top_keywords, full_articles_data, brand="Brand", compe
     all_brands = kpis.get('all_brands', [brand] + competitors)
     mis = kpis.get('mis', 0); mpi = kpis.get('mpi', 0)
     engagement = kpis.get('engagement_rate', 0); reach = kpis.get('reach', 0)
-    generated_on = datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
+    generated_on = generated_on or report_timestamp()
     if isinstance(timeframe_hours, int): time_text = f"the last {timeframe_hours} hours"
     else: time_text = timeframe_hours
 
     # --- Generate AI Summary ---
-    ai_summary = "AI Summary generation failed."
-    try:
-        # Pass competitors list to AI summary function
-        ai_summary = generate_ai_summary(kpis, top_keywords, full_articles_data, brand, competitors)
-    except Exception as ai_e: print(f"Error generating AI summary: {ai_e}")
+    # Submitted first so the Bedrock round trip overlaps the markdown body and PDF page-1 work below
+    if ai_summary is None: ai_future = _submit_ai_summary(kpis, top_keywords, full_articles_data, brand, competitors)
+    else: ai_future = Future(); ai_future.set_result(ai_summary) # Caller already has it
 
-    # --- FIX: Restore md_lines creation ---
     # ---- 1. Markdown Generation ----
-    md_lines = [f"# Flash Narrative Report: {brand}",
-                f"**Period:** {time_text}",
-                f"**Generated:** {generated_on}",
-                "\n## Executive Summary",
-                ai_summary, # Add AI summary here
-                "\n## Key Performance Indicators",
-                f"- **Media Impact Score (MIS):** {mis:.0f}",
-                f"- **Message Penetration (MPI):** {mpi:.1f}%",
-                f"- **Avg. Social Engagement:** {engagement:.1f}",
-                f"- **Total Reach:** {reach:,}",
-                f"- **Sentiment Ratio:** " + ", ".join([f"{k.capitalize()}: {v:.1f}%" for k, v in sentiment_ratio.items()]),
-                "\n### Share of Voice (SOV)",
-                "| Brand | SOV (%) |", "|---|---|"]
-    if len(sov) < len(all_brands): sov += [0] * (len(all_brands) - len(sov))
-    for b, s in zip(all_brands, sov): md_lines.append(f"| {b} | {s:.1f} |")
+    md_values = {"brand": brand, "time_text": time_text, "generated_on": generated_on,
+                 "mis": mis, "mpi": mpi, "engagement": engagement, "reach": reach,
+                 "sentiment_text": ", ".join([f"{k.capitalize()}: {v:.1f}%" for k, v in sentiment_ratio.items()])}
+    sov_row = islice(chain(sov, repeat(0)), len(all_brands)) # Zero-pads missing brands without touching kpis['sov']
+    md_lines = ["\n".join(map(_SOV_ROW, zip(all_brands, sov_row)))] # Header (which embeds the AI summary) is prepended below
 
     # Add Mention Categories to Markdown
-    md_lines.append(f"\n## {brand} News Mentions")
-    if main_brand_mentions:
-        for item in main_brand_mentions[:10]: # Limit in markdown
-             md_lines.append(f"- **{item.get('text','No Headline')[:150]}...** ([{item.get('source','Source')}]({item.get('link','#')}))")
-    else: md_lines.append("_No specific mentions found._")
-
-    md_lines.append("\n## Competition News Mentions")
-    if competitor_mentions:
-         for item in competitor_mentions[:10]:
-              md_lines.append(f"- **{item.get('text','No Headline')[:150]}...** ([{item.get('source','Source')}]({item.get('link','#')}))")
-    else: md_lines.append("_No competitor mentions found._")
-
-    md_lines.append("\n## Related News / Passive Mentions")
-    if related_mentions:
-         for item in related_mentions[:10]:
-              md_lines.append(f"- **{item.get('text','No Headline')[:150]}...** ([{item.get('source','Source')}]({item.get('link','#')}))")
-    else: md_lines.append("_No related mentions found._")
-
-    md_lines.append("\n## Top Keywords & Phrases")
-    if top_keywords:
-        for w, f in top_keywords: md_lines.append(f"- {w}: {f}")
-    else: md_lines.append("- No keywords identified.")
-
-    # Now join the list that was just created
-    md = "\n".join(md_lines)
-    # --- END OF FIX ---
+    md_lines += [f"\n## {brand} News Mentions", _md_mention_list(main_brand_mentions, "_No specific mentions found._"),
+                 "\n## Competition News Mentions", _md_mention_list(competitor_mentions, "_No competitor mentions found._"),
+                 "\n## Related News / Passive Mentions", _md_mention_list(related_mentions, "_No related mentions found._"),
+                 "\n## Top Keywords & Phrases",
+                 "\n".join(map(_KW_ROW, map(tuple, top_keywords))) if top_keywords else "- No keywords identified."]
 
 
     # ---- 2. PDF Generation ----
-    pdf_buffer = io.BytesIO()
-    c = canvas.Canvas(pdf_buffer, pagesize=letter)
-    width, height = letter
-    margin_x = 50; margin_y = 60
-    content_width = width - 2 * margin_x
-
-    # --- Page 1 ---
-    y = height - margin_y
-
-    # Title and Date
-    c.setFont("Helvetica-Bold", 18); c.drawString(margin_x, y, f"Flash Narrative Report: {brand}"); y -= 20
-    c.setFont("Helvetica", 10); c.drawString(margin_x, y, f"Period: {time_text} | Generated: {generated_on}"); y -= 25
-
-    # KPIs
-    c.setFont("Helvetica-Bold", 12); c.drawString(margin_x, y, "Key Performance Indicators"); y -= 16
-    c.setFont("Helvetica", 10)
-    kpi_text = f"MIS: {mis:.0f} | MPI: {mpi:.1f}% | Avg. Engagement: {engagement:.1f} | Reach: {reach:,}"
-    lines = textwrap.wrap(kpi_text, width=70)
-    kpi_block_height = 0
-    for line in lines: c.drawString(margin_x, y, line); y -= 14; kpi_block_height += 14
-
-    # Sentiment Pie Chart
-    pie_buf = _create_sentiment_pie(sentiment_ratio)
-    try:
-        img = ImageReader(pie_buf)
-        img_width = 150; img_height = 150
-        img_x = width - margin_x - img_width - 20
-        img_y = height - margin_y - 20 - img_height
-        c.drawImage(img, img_x, img_y, width=img_width, height=img_height, preserveAspectRatio=True, mask='auto')
-        y = min(y, img_y - 20)
-    except Exception as pie_e:
-        print(f"Error drawing pie chart: {pie_e}")
-        img_x = width - margin_x - 150 - 20; img_y = height - margin_y - 20 - 150
-        c.setFont("Helvetica-Oblique", 9); c.drawString(img_x, img_y + 75, "(Sentiment chart failed)")
-        y -= 20
-
-    # AI Summary Section (Improved page break logic)
-    y -= 10
-    c.setFont("Helvetica-Bold", 12)
-    # Check space BEFORE title
-    if y < margin_y + 40: c.showPage(); y = height - margin_y
-    c.drawString(margin_x, y, "AI Summary & Recommendations"); y -= 16
-
-    ai_lines = ai_summary.split('\n')
-    for r in ai_lines:
-        r = r.strip()
-        if not r:
-            if y < margin_y + 10: c.showPage(); y = height - margin_y # Check break for space too
-            y -= 6; continue
-
-        is_bold = r.startswith("**")
-        if is_bold: c.setFont("Helvetica-Bold", 10); r = r.replace("**", "")
-        else: c.setFont("Helvetica", 10)
-
-        lines = textwrap.wrap(r, width=85)
-        for line in lines:
-            # Check break BEFORE drawing line
-            if y < margin_y + 10:
-                c.showPage(); y = height - margin_y
-                if is_bold: c.setFont("Helvetica-Bold", 10)
-                else: c.setFont("Helvetica", 10)
-            c.drawString(margin_x, y, line); y -= 12 # Move down AFTER drawing
-    y -= 15 # Space after AI summary
-
-    # --- Mention Sections ---
-    if y < height / 2: c.showPage(); y = height - margin_y # Check before first section
-    y = _draw_mention_section(c, y, f"{brand} News Mentions", main_brand_mentions, content_width, margin_x, height)
-    y = _draw_mention_section(c, y, "Competition News Mentions", competitor_mentions, content_width, margin_x, height)
-    y = _draw_mention_section(c, y, "Related News / Passive Mentions", related_mentions, content_width, margin_x, height)
-
-    # Keywords Section
-    if y < 150: c.showPage(); y = height - margin_y # Check before keywords
-    c.setFont("Helvetica-Bold", 12); c.drawString(margin_x, y, "Top Keywords & Phrases"); y -= 16
-    c.setFont("Helvetica", 10)
-    kw_count = 0
-    for w, f in top_keywords:
-        text = f"- {w}: {f}"
-        if y < margin_y + 10: # Check break inside loop
-             c.showPage(); y = height - margin_y
-             c.setFont("Helvetica-Bold", 12); c.drawString(margin_x, y, "Top Keywords & Phrases (cont.)"); y -= 16
-             c.setFont("Helvetica", 10)
-        c.drawString(margin_x, y, text); y -= 12
-        kw_count += 1
-    if kw_count == 0:
-        c.setFont("Helvetica-Oblique", 10); c.drawString(margin_x, y, "No keywords identified."); y -= 20
-
-    # --- Finalize PDF ---
-    c.save()
-    pdf_bytes = pdf_buffer.getvalue()
-    pdf_buffer.close()
+    pdf_out = tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_SIZE) if stream else None
+    pdf_bytes = pdf_out if stream else b""
+    if "pdf" in formats: # Canvas + pie chart are the expensive part; markdown/JSON-only callers skip them
+        c = canvas.Canvas(pdf_out, pagesize=letter, pageCompression=int(compress)) # No buffer unless streaming: serialized once by getpdfdata()
+        width, height = letter
+        margin_x = 50; margin_y = 60
+        content_width = width - 2 * margin_x
+
+        # --- Page 1 ---
+        y = height - margin_y
+
+        # Title and Date
+        c.setFont("Helvetica-Bold", 18); c.drawString(margin_x, y, f"Flash Narrative Report: {brand}"); y -= 20
+        c.setFont("Helvetica", 10); c.drawString(margin_x, y, f"Period: {time_text} | Generated: {generated_on}"); y -= 25
+
+        # KPIs
+        c.setFont("Helvetica-Bold", 12); c.drawString(margin_x, y, "Key Performance Indicators"); y -= 16
+        kpi_text = f"MIS: {mis:.0f} | MPI: {mpi:.1f}% | Avg. Engagement: {engagement:.1f} | Reach: {reach:,}"
+        y = _draw_text_lines(c, _wrap(kpi_text, 70), margin_x, y, "Helvetica", 10, 14, margin_y, height - margin_y)
+
+        # Sentiment Pie Chart
+        try:
+            pie_drawing = _create_sentiment_pie(sentiment_ratio)
+            img_x = width - margin_x - PIE_SIZE - 20
+            img_y = height - margin_y - 20 - PIE_SIZE
+            renderPDF.draw(pie_drawing, c, img_x, img_y)
+            y = min(y, img_y - 20)
+        except Exception as pie_e:
+            print(f"Error drawing pie chart: {pie_e}")
+            img_x = width - margin_x - 150 - 20; img_y = height - margin_y - 20 - 150
+            c.setFont("Helvetica-Oblique", 9); c.drawString(img_x, img_y + 75, "(Sentiment chart failed)")
+            y -= 20
+
+        # AI Summary Section (Improved page break logic)
+        ai_summary = ai_future.result() # Page 1 above didn't need it; block only now
+        y -= 10
+        c.setFont("Helvetica-Bold", 12)
+        # Check space BEFORE title
+        if y < margin_y + 40: c.showPage(); y = height - margin_y
+        c.drawString(margin_x, y, "AI Summary & Recommendations"); y -= 16
+
+        ai_lines = ai_summary.split('\n')
+        for r in ai_lines:
+            r = r.strip()
+            if not r:
+                if y < margin_y + 10: c.showPage(); y = height - margin_y # Check break for space too
+                y -= 6; continue
+
+            is_bold = r.startswith("**")
+            if is_bold: r = r.replace("**", "")
+            # Break check happens BEFORE each line; y moves down AFTER drawing
+            y = _draw_text_lines(c, _wrap(r, 85), margin_x, y, "Helvetica-Bold" if is_bold else "Helvetica", 10, 12, margin_y + 10, height - margin_y)
+        y -= 15 # Space after AI summary
+
+        # --- Mention Sections ---
+        if y < height / 2: c.showPage(); y = height - margin_y # Check before first section
+        y = _draw_mention_section(c, y, f"{brand} News Mentions", main_brand_mentions, content_width, margin_x, height)
+        y = _draw_mention_section(c, y, "Competition News Mentions", competitor_mentions, content_width, margin_x, height)
+        y = _draw_mention_section(c, y, "Related News / Passive Mentions", related_mentions, content_width, margin_x, height)
+
+        # Keywords Section
+        if y < 150: c.showPage(); y = height - margin_y # Check before keywords
+        c.setFont("Helvetica-Bold", 12); c.drawString(margin_x, y, "Top Keywords & Phrases"); y -= 16
+        if top_keywords:
+            def kw_cont_header(c, y):
+                c.setFont("Helvetica-Bold", 12); c.drawString(margin_x, y, "Top Keywords & Phrases (cont.)"); return y - 16
+            y = _draw_text_lines(c, list(map(_KW_ROW, map(tuple, top_keywords))), margin_x, y, "Helvetica", 10, 12, margin_y + 10, height - margin_y, kw_cont_header)
+        else:
+            c.setFont("Helvetica-Oblique", 10); c.drawString(margin_x, y, "No keywords identified."); y -= 20
+
+        # --- Finalize PDF ---
+        if stream: c.save(); pdf_out.seek(0) # Caller reads/streams the file; no getvalue() copy
+        else: pdf_bytes = c.getpdfdata() # Same bytes save() would write, without the BytesIO write + getvalue() copy
 
     # ---- 3. Return Values ----
+    ai_summary = ai_future.result() # Already resolved when the PDF was drawn
+    md_values["ai_summary"] = ai_summary
+    md = "\n".join([_MD_HEADER_TEMPLATE.format_map(md_values), *md_lines])
     json_summary = {"brand": brand, "competitors": competitors, "kpis": kpis, "top_keywords": top_keywords, "generated_on": generated_on, "ai_summary": ai_summary}
 
     if include_json:
         return md, pdf_bytes, json_summary
     return md, pdf_bytes
+
+
+def generate_report_stream(kpis, top_keywords, full_articles_data, **kwargs):
+    """
+    generate_report(..., stream=True): returns (md, pdf_file[, json_summary]) where pdf_file is a
+    SpooledTemporaryFile rewound to 0. Copy it out with shutil.copyfileobj (HTTP response, upload) and close it when done.
+    """
+    return generate_report(kpis, top_keywords, full_articles_data, stream=True, **kwargs)
+
+
+# --- Batch generation ---
+def _generate_one(report_kwargs):
+    """Top-level (picklable) worker for generate_reports_batch."""
+    return generate_report(**report_kwargs)
+
+# A spawned worker re-imports streamlit/boto3/nltk/reportlab (~0.6 s) and starts with an empty AI-summary memo,
+# while one report renders in-process in ~5-16 ms; processes only pay off for big batches on multi-core hosts.
+BATCH_PROCESS_MIN_TASKS = 200
+
+def generate_reports_batch(tasks, max_workers=None):
+    """
+    Runs generate_report(**kwargs) for each kwargs dict in `tasks`; returns the results in task order.
+    Batches smaller than BATCH_PROCESS_MIN_TASKS (or on a single core) run in a plain in-process loop; larger
+    ones are spread over one process per core, since ReportLab canvas work holds the GIL.
+    stream=True tasks are rejected: a SpooledTemporaryFile can't be pickled back from a worker.
+    """
+    generated_on = report_timestamp() # One timestamp for the whole batch
+    tasks = [{"generated_on": generated_on, **t} for t in tasks]
+    if any(t.get("stream") for t in tasks): raise ValueError("generate_reports_batch doesn't support stream=True tasks")
+    workers = min(len(tasks), max_workers or os.cpu_count() or 1)
+    if len(tasks) < BATCH_PROCESS_MIN_TASKS or workers < 2: return [_generate_one(t) for t in tasks]
+    # spawn, not fork: summary worker threads (and Streamlit's own) may be running, and forking a threaded process can deadlock
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as ex:
+        return list(ex.map(_generate_one, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
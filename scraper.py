@@ -9,7 +9,8 @@ Mixed scraper:
 - Dummy social scrapers for FB/IG/Threads (existing behavior)
 
 Main public function:
-    fetch_all(brand, time_frame_hours, competitors, industry=None)
+    fetch_all(brand, time_frame_hours, competitors, industry=None, use_async=True)
+    fetch_all_async(...) -> awaitable variant that queries the sources concurrently
 
 Returns:
     {'mentions': [...texts...], 'full_data': [...article dicts...]}
@@ -18,6 +19,7 @@ Returns:
 import os
 import json
 import time
+import asyncio
 import requests
 import random
 from datetime import datetime, timedelta, timezone
@@ -504,27 +506,11 @@ def fetch_reddit(brand, time_frame_hours, competitors):
 
 # --- Public Interface ---
 
-def fetch_all(brand, time_frame, competitors=None, industry='default'):
+def _gather_sources(brand, time_frame, competitors, industry):
     """
-    Fetches all mentions from all sources.
-    Returns: {'mentions': [texts], 'full_data': [dicts]}
+    Queries every source one after another (sync path).
+    Returns the aggregated list of mention dicts.
     """
-    if competitors is None:
-        competitors = []
-    
-    # Use 'default' for 'Personal Brand'
-    if industry.lower() == 'personal brand':
-        industry = 'default'
-
-    cache = _cache_read()
-    cache_key = _get_cache_key(brand, time_frame, competitors)
-    cached_entry = cache.get(cache_key)
-    if cached_entry and _is_cache_valid(cached_entry.get('ts', 0)):
-        try:
-            return cached_entry['value']
-        except Exception:
-            pass 
-
     aggregated = []
     
     # 1) Primary: NewsAPI
@@ -569,7 +555,42 @@ def fetch_all(brand, time_frame, competitors=None, industry='default'):
     except Exception as e:
         print(f"[fetch_all Dummy Error] {e}")
 
-    # Normalize unique by link+text to avoid duplicates
+    return aggregated
+
+async def _run_source(label, func, *args):
+    """
+    Runs a blocking source fetcher in a worker thread.
+    Errors are logged and turned into an empty result, like the sync path.
+    """
+    try:
+        return await asyncio.to_thread(func, *args) or []
+    except Exception as e:
+        print(f"[fetch_all {label} Error] {e}")
+        return []
+
+async def _gather_sources_async(brand, time_frame, competitors, industry):
+    """
+    Same sources and result order as _gather_sources, but the requests overlap.
+    Google News is still only queried when NewsAPI + RSS return fewer than 5 items.
+    """
+    newsapi_results, rss_results, reddit_results, fb, ig, threads = await asyncio.gather(
+        _run_source('NewsAPI', fetch_newsapi, brand, time_frame, competitors, NEWSAPI_KEYS),
+        _run_source('RSS', fetch_rss_for_industry, industry or 'default', brand, time_frame, competitors),
+        _run_source('Reddit', fetch_reddit, brand, time_frame, competitors),
+        _run_source('Dummy', generate_dummy_mentions, brand, competitors, time_frame, 'fb'),
+        _run_source('Dummy', generate_dummy_mentions, brand, competitors, time_frame, 'ig'),
+        _run_source('Dummy', generate_dummy_mentions, brand, competitors, time_frame, 'threads'),
+    )
+    aggregated = newsapi_results + rss_results
+    if len(aggregated) < 5:
+        aggregated.extend(await _run_source('Google News', fetch_google_news_html, brand, time_frame, competitors))
+    aggregated.extend(reddit_results + fb + ig + threads)
+    return aggregated
+
+def _normalize(aggregated):
+    """
+    Drops duplicates (same link + text prefix) and builds the public result dict.
+    """
     seen = set()
     normalized = []
     for a in aggregated:
@@ -579,7 +600,52 @@ def fetch_all(brand, time_frame, competitors=None, industry='default'):
         seen.add(signature)
         normalized.append(a)
 
-    out = {'mentions': [m['text'] for m in normalized], 'full_data': normalized}
+    return {'mentions': [m['text'] for m in normalized], 'full_data': normalized}
+
+async def fetch_all_async(brand, time_frame, competitors=None, industry='default'):
+    """
+    Fetches all mentions from all sources concurrently (no disk cache).
+    Returns: {'mentions': [texts], 'full_data': [dicts]}
+    """
+    if competitors is None:
+        competitors = []
+    if industry.lower() == 'personal brand':
+        industry = 'default'
+    return _normalize(await _gather_sources_async(brand, time_frame, competitors, industry))
+
+def fetch_all(brand, time_frame, competitors=None, industry='default', use_async=True, use_cache=True):
+    """
+    Fetches all mentions from all sources.
+    With use_async (default) the sources are queried concurrently; pass False for the serial path.
+    use_cache=False skips the disk cache lookup (forces a fresh scrape); the fresh result is still written back.
+    Returns: {'mentions': [texts], 'full_data': [dicts]}
+    """
+    if competitors is None:
+        competitors = []
+    
+    # Use 'default' for 'Personal Brand'
+    if industry.lower() == 'personal brand':
+        industry = 'default'
+
+    cache = _cache_read()
+    cache_key = _get_cache_key(brand, time_frame, competitors)
+    cached_entry = cache.get(cache_key) if use_cache else None
+    if cached_entry and _is_cache_valid(cached_entry.get('ts', 0)):
+        try:
+            return cached_entry['value']
+        except Exception:
+            pass 
+
+    aggregated = None
+    if use_async:
+        try:
+            aggregated = asyncio.run(_gather_sources_async(brand, time_frame, competitors, industry))
+        except RuntimeError as e: # e.g. called from inside a running event loop
+            print(f"[fetch_all Async Error] {e}; falling back to serial fetch")
+    if aggregated is None:
+        aggregated = _gather_sources(brand, time_frame, competitors, industry)
+
+    out = _normalize(aggregated)
 
     # write to cache
     try:
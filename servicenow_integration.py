@@ -2,14 +2,30 @@
 import os
 import requests
 import base64
-from slack_sdk import WebClient
-import smtplib
-from email.mime.text import MIMEText
-# --- Add imports for attachments ---
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
-# --- End imports ---
+import threading
+import streamlit as st
+# slack_sdk / smtplib / email.mime are imported inside the functions that send,
+# so importing this module (every dashboard session) stays cheap
+
+# --- Cached Clients ---
+_thread_local = threading.local()
+
+def get_servicenow_session():
+    """
+    requests.Session for the calling thread, so repeat tickets reuse the keep-alive TLS connection.
+    One per thread (not st.cache_resource): Session isn't thread-safe, and a process-wide one would
+    share cookies between every user's Streamlit session.
+    """
+    session = getattr(_thread_local, "servicenow_session", None)
+    if session is None:
+        session = _thread_local.servicenow_session = requests.Session()
+    return session
+
+@st.cache_resource
+def get_slack_client(token):
+    """Slack WebClient per token, built once per process instead of per alert."""
+    from slack_sdk import WebClient
+    return WebClient(token=token)
 
 def create_servicenow_ticket(title, description, urgency='2', impact='2'):
     """
@@ -38,7 +54,7 @@ def create_servicenow_ticket(title, description, urgency='2', impact='2'):
             'urgency': urgency,
             'impact': impact
         }
-        response = requests.post(url, headers=headers, json=body, timeout=10)
+        response = get_servicenow_session().post(url, headers=headers, json=body, timeout=10)
         response.raise_for_status()
         ticket_num = response.json().get('result', {}).get('number', 'UNKNOWN')
         print(f"[ServiceNow Ticket Created] {ticket_num}")
@@ -58,7 +74,7 @@ def send_alert(msg, channel='#alerts', to_email=None):
     token = os.getenv('SLACK_TOKEN')
     if token:
         try:
-            client = WebClient(token=token)
+            client = get_slack_client(token)
             client.chat_postMessage(channel=channel, text=msg)
             print("[Slack Alert Sent]")
             sent = True
@@ -72,6 +88,8 @@ def send_alert(msg, channel='#alerts', to_email=None):
         smtp_user = os.getenv('SMTP_USER')
         smtp_pass = os.getenv('SMTP_PASS') # Use App Password for Gmail
         if smtp_user and smtp_pass:
+            import smtplib
+            from email.mime.text import MIMEText
             try:
                 server = smtplib.SMTP(smtp_server, smtp_port, timeout=10)
                 server.starttls()
@@ -96,6 +114,11 @@ def send_report_email_with_attachments(to_email, subject, body, attachments):
     """
     Sends an email with one or more attachments. Returns True/False.
     """
+    import smtplib
+    from email.mime.text import MIMEText
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.base import MIMEBase
+    from email import encoders
     smtp_server = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
     smtp_port = int(os.getenv('SMTP_PORT', 587))
     smtp_user = os.getenv('SMTP_USER')
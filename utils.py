@@ -17,12 +17,9 @@ def clean_text(text):
 
 def safe_get(d, key, default=None):
     """
-    Safely get value from dict; returns default if key missing.
+    Safely get value from dict; returns default if key missing or d is not a dict.
     """
-    try:
-        return d.get(key, default)
-    except Exception:
-        return default
+    return d.get(key, default) if isinstance(d, dict) else default
 
 def ensure_sentiment(full_data, default='neutral'):
     """